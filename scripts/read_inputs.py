@@ -1,33 +1,32 @@
 import csv
+import io
 from pathlib import Path
+import re
 
 INPUT_OVER15 = Path("input/Over15.csv")
 INPUT_OVER05 = Path("input/Over05_1h.csv")
 
+# idx,match,... -> match, only when it looks like "Home vs Away" (unquoted files only)
+_RE_MATCH = re.compile(r"^[^,\r\n]*,[ \t]*([^,\r\n]*? vs [^,\r\n]*)", re.M)
 
-def extract_matches(csv_path: Path):
-    matches = []
-
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-
-        for row in reader:
-            # necesitamos al menos 2 columnas
-            if len(row) < 2:
-                continue
 
-            match = row[1].strip()
-
-            # saltar basura
-            if not match:
-                continue
-            if match.lower().startswith("filtro"):
-                continue
-            if " vs " not in match:
-                continue
-
-            matches.append(match)
+def extract_matches(csv_path: Path):
+    text = csv_path.read_text(encoding="utf-8")
+    if '"' in text:
+        # campos entrecomillados (p.ej. re-exportado desde una hoja de cálculo): csv.reader
+        rows = csv.reader(io.StringIO(text, newline=""))
+        candidates = [m for m in (row[1].strip() for row in rows if len(row) >= 2) if " vs " in m]
+    else:
+        # una sola pasada de regex sobre todo el fichero: columna 2 con " vs "
+        candidates = _RE_MATCH.findall(text)
 
+    matches = []
+    for match in candidates:
+        match = match.strip()
+        # saltar basura
+        if not match or match.lower().startswith("filtro"):
+            continue
+        matches.append(match)
     return matches
 
 
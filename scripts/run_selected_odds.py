@@ -3,20 +3,41 @@
 # - Read input/Over15.csv and input/Over05_1h.csv
 # - For each match, try to find a VALID OddsPortal match page via search
 # - NEVER output fake links. If not validated -> leave blank and mark link-miss.
-# - Save out/match_links.csv + debug screenshots
+# - Save out/match_links.csv (+ debug screenshots of misses when OH_DEBUG_DUMP=1)
+# - Matches are resolved concurrently over a pool of OH_POOL_SIZE pages (default 8)
+# - Validated links are cached in .oh-cache/match_links.sqlite for OH_CACHE_TTL seconds
+#   (default 7 days); --no-cache bypasses it and the search HTML cache
+# - --shard/--num-shards split the fixtures across CI runners (see .github/workflows/odds.yml)
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import csv
+import hashlib
+import json
 import os
 import re
+import sqlite3
 import sys
 import time
+import unicodedata
+import zlib
+from contextlib import asynccontextmanager, closing
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple, List
+from urllib.parse import urlsplit
 
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+import lxml.html
+from playwright.async_api import async_playwright, Locator, Page, Route, TimeoutError as PWTimeoutError
+
+try:
+    # Optional (pip install oddsharvester[scripts]); without it the search step uses Playwright.
+    from curl_cffi.requests import AsyncSession
+except ImportError:
+    AsyncSession = None
 
 
 INPUT_OVER15 = Path("input/Over15.csv")
@@ -24,18 +45,63 @@ INPUT_OVER05_1H = Path("input/Over05_1h.csv")
 OUT_DIR = Path("out")
 DEBUG_DIR = OUT_DIR / "debug"
 OUT_MATCH_LINKS = OUT_DIR / "match_links.csv"
+# Lookup caches live outside out/ so they are not shipped with the outputs (OH_CACHE_DIR)
+CACHE_DIR = Path(os.environ.get("OH_CACHE_DIR") or ".oh-cache")
+LINK_CACHE_FILE = CACHE_DIR / "match_links.sqlite"
+SEARCH_CACHE_DIR = CACHE_DIR / "search"
+# Chromium profile kept between runs: consent cookie + HTTP cache survive (OH_PROFILE_DIR)
+PROFILE_DIR = Path(os.environ.get("OH_PROFILE_DIR") or ".pw-profile")
 
 # ---- Helpers ----
 
-def _slug(s: str) -> str:
-    s = s.lower().strip()
+_RE_WS = re.compile(r"\s+")
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+def _build_accent_table() -> Dict[int, str]:
+    # Latin letters -> ASCII base ("ü" -> "u"), so "Fürth" slugs like OddsPortal's "Furth"
+    # instead of losing the letter. Built once; str.translate then folds in a single C pass.
+    # Letters NFKD has no decomposition for, escaped so look-alikes of ASCII letters stay visible
+    table = {
+        ord("\u00df"): "ss",  # sharp s
+        ord("\u00e6"): "ae",  # ae ligature
+        ord("\u0153"): "oe",  # oe ligature
+        ord("\u00f8"): "o",  # o with stroke
+        ord("\u0111"): "d",  # d with stroke
+        ord("\u0142"): "l",  # l with stroke
+        ord("\u0131"): "i",  # dotless i
+    }
+    for cp in range(0xC0, 0x250):
+        base = unicodedata.normalize("NFKD", chr(cp)).encode("ascii", "ignore").decode("ascii")
+        if base and cp not in table:
+            table[cp] = base
+    return table
+
+_ACCENT_TABLE = _build_accent_table()
+
+def _env_true(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+def _normalize(s: str) -> str:
+    s = s.lower().strip().translate(_ACCENT_TABLE)
     # normalize common separators
     s = s.replace("&", "and")
-    s = re.sub(r"\s+", " ", s)
+    s = _RE_WS.sub(" ", s)
     # keep letters/numbers/spaces only
-    s = re.sub(r"[^a-z0-9 ]+", "", s)
+    s = _RE_NON_ALNUM.sub("", s)
     return s.strip()
 
+@lru_cache(maxsize=4096)
+def _slug(s: str) -> str:
+    # Cached: team names recur across tasks and buckets. Page text goes through _normalize directly.
+    return _normalize(s)
+
+@lru_cache(maxsize=4096)
 def _split_match(match: str) -> Tuple[str, str]:
     # Expect "Home vs Away"
     if " vs " in match:
@@ -47,15 +113,60 @@ def _split_match(match: str) -> Tuple[str, str]:
         return parts[0].strip(), parts[1].strip()
     return match.strip(), ""
 
-def _read_input_csv(path: Path) -> List[Tuple[int, str, str]]:
+def _match_key(match: str) -> str:
+    # Same fixture in both buckets -> same key, whatever the spacing/punctuation of the input.
+    home, away = _split_match(match)
+    return f"{_slug(home)}|{_slug(away)}"
+
+def _rank_candidates(hrefs: List[str], home_s: str, away_s: str) -> List[str]:
+    """
+    Orders candidate URLs by how many team-name tokens their match slug ("home-away-<id>") contains,
+    best first (ties keep search-result order), using set intersection on tokens rather than substring scans.
+    If any URL reaches the threshold and names both teams, only those are kept.
+    The threshold is every token, capped at 4: long official names ("Club Atletico de Madrid")
+    are shortened in URL slugs, so demanding all of them would never match. The cap alone would let
+    a long home name carry a URL on its own, hence at least one token of each team is also required.
+    """
+    home_t = frozenset(home_s.split())
+    away_t = frozenset(away_s.split())
+    wanted = home_t | away_t
+    need = min(len(wanted), 4)
+    scored: List[Tuple[int, bool, str]] = []
+    for h in hrefs:
+        tokens = set(h.rstrip("/").rsplit("/", 1)[-1].split("-"))
+        score = len(wanted & tokens)
+        scored.append((score, score >= need and not home_t.isdisjoint(tokens) and not away_t.isdisjoint(tokens), h))
+    scored.sort(key=lambda sfh: -sfh[0])  # stable: ties keep search-result order
+    return [h for _, full, h in scored if full] or [h for _, _, h in scored]
+
+class TeamMatcher:
+    """
+    Single-pass check that a text names both teams.
+    Both slugs are compiled into one zero-width alternation (longest first), so overlapping or
+    nested names still register and the scan stops as soon as both have been seen.
+    """
+
+    def __init__(self, home_s: str, away_s: str) -> None:
+        names = sorted([("h", home_s), ("a", away_s)], key=lambda kv: -len(kv[1]))
+        self._same = home_s == away_s
+        self._pattern = re.compile("(?=" + "|".join(f"(?P<{k}>{re.escape(v)})" for k, v in names) + ")")
+
+    def matches(self, text: str) -> bool:
+        seen = set()
+        for m in self._pattern.finditer(text):
+            seen.add(m.lastgroup)
+            if self._same or len(seen) == 2:
+                return True
+        return False
+
+def _read_input_csv(path: Path) -> Iterator[Tuple[int, str, str]]:
+    # Lazily yields (idx, match, league) rows.
     if not path.exists():
-        return []
-    rows: List[Tuple[int, str, str]] = []
-    with path.open("r", encoding="utf-8", newline="") as f:
+        return
+    with path.open("r", encoding="utf-8", newline="", buffering=1 << 20) as f:
         # Try DictReader first (expects header idx,match,league)
-        sample = f.read(4096)
+        has_header = "match" in f.readline().lower()
         f.seek(0)
-        has_header = "match" in sample.splitlines()[0].lower()
         if has_header:
             r = csv.DictReader(f)
             for line in r:
@@ -66,7 +177,7 @@ def _read_input_csv(path: Path) -> List[Tuple[int, str, str]]:
                 match = (line.get("match") or "").strip()
                 league = (line.get("league") or "").strip()
                 if idx and match:
-                    rows.append((idx, match, league))
+                    yield idx, match, league
         else:
             # Fallback: assume format idx,match,league without header
             r2 = csv.reader(f)
@@ -80,12 +191,35 @@ def _read_input_csv(path: Path) -> List[Tuple[int, str, str]]:
                 match = parts[1].strip()
                 league = parts[2].strip() if len(parts) >= 3 else ""
                 if idx and match:
-                    rows.append((idx, match, league))
-    return rows
+                    yield idx, match, league
 
 def _timestamp() -> str:
     return time.strftime("%Y%m%d_%H%M%S")
 
+DEBUG_DUMP = _env_true("OH_DEBUG_DUMP")
+
+ShotQueue = asyncio.Queue[Optional[Tuple[Path, bytes]]]
+
+async def _debug_screenshot(page: Page, name: str, shots: ShotQueue) -> None:
+    # Viewport-only capture (far cheaper than full_page) while the page still shows this task;
+    # writing the PNG is left to _screenshot_writer so the worker moves straight on.
+    if not DEBUG_DUMP:
+        return
+    try:
+        png = await page.screenshot()
+    except Exception:
+        return
+    shots.put_nowait((DEBUG_DIR / f"{_timestamp()}_{name}.png", png))
+
+async def _screenshot_writer(shots: ShotQueue) -> None:
+    # Drains the queue until the None sentinel.
+    while (item := await shots.get()) is not None:
+        path, png = item
+        try:
+            await asyncio.to_thread(path.write_bytes, png)
+        except OSError:
+            pass
+
 @dataclass
 class MatchTask:
     bucket: str
@@ -95,112 +229,425 @@ class MatchTask:
     oddsportal_link: str = ""   # empty unless validated
     status: str = "pending"     # ok / link-miss
 
+OUT_HEADER = ["bucket", "idx", "match", "league", "oddsportal_link", "status"]
+
+class OrderedRowWriter:
+    """
+    Streams finished tasks to the CSV in input order: a row is written once it and every row
+    before it are resolved, so an aborted run still leaves the resolved prefix on disk.
+    No explicit flush per row; the file buffer (flushed on close) handles batching.
+    """
+
+    def __init__(self, writer, tasks: List[MatchTask]) -> None:
+        self._writer = writer
+        self._tasks = tasks
+        self._next = 0
+
+    def advance(self) -> None:
+        while self._next < len(self._tasks) and self._tasks[self._next].status != "pending":
+            t = self._tasks[self._next]
+            self._writer.writerow([t.bucket, t.idx, t.match, t.league, t.oddsportal_link, t.status])
+            self._next += 1
+
 # ---- OddsPortal logic ----
 
 ODDSPORTAL_BASE = "https://www.oddsportal.com"
 
-def _accept_cookies_if_present(page) -> None:
-    # Try several common buttons. If not present, ignore.
-    candidates = [
-        "button:has-text('I Accept')",
-        "button:has-text('Accept')",
-        "button:has-text('Accept All')",
-        "text=I Accept",
-        "text=Accept All",
-    ]
-    for sel in candidates:
-        try:
-            btn = page.locator(sel).first
-            if btn and btn.is_visible(timeout=800):
-                btn.click(timeout=800)
-                page.wait_for_timeout(300)
-                return
-        except Exception:
-            pass
+class DomainRateLimiter:
+    """
+    Keeps at least min_delay_ms between two requests to the same host, across all workers.
+    Concurrent callers for one host queue up on its lock instead of sleeping blindly.
+    """
 
-def _close_overlays(page) -> None:
+    def __init__(self, min_delay_ms: int = 200) -> None:
+        self._min_delay = min_delay_ms / 1000
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last: Dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._last.get(host, 0.0) + self._min_delay - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last[host] = time.monotonic()
+
+_LIMITER = DomainRateLimiter(max(0, _env_int("OH_MIN_DELAY_MS", 200)))
+
+# Fail fast: a page that has not loaded in 15 s is a dead search, not a slow one.
+NAV_TIMEOUT_MS = 15000
+ACTION_TIMEOUT_MS = 5000
+
+async def _goto(page: Page, url: str, ready_selector: str) -> None:
+    # Proceed as soon as ready_selector is in the DOM rather than after a fixed sleep.
+    await _LIMITER.wait(urlsplit(url).netloc)
+    await page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+    try:
+        await page.wait_for_selector(ready_selector, state="attached", timeout=ACTION_TIMEOUT_MS)
+    except PWTimeoutError:
+        # Layout may differ (e.g. no results); give it a short grace and let the caller decide.
+        await page.wait_for_timeout(200)
+
+_HTTP_SESSION = None
+
+def _http_session():
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        _HTTP_SESSION = AsyncSession(impersonate="chrome124")
+    return _HTTP_SESSION
+
+async def _close_http_session() -> None:
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None:
+        await _HTTP_SESSION.close()
+        _HTTP_SESSION = None
+
+# Result anchors under "/football/", minus league "/results/" archives, which are never a match page.
+_MATCH_ANCHOR_CSS = "a[href^='/football/']:not([href*='/results/'])"
+# Same filter for lxml, plus the match-page depth check (at least 4 "/" in the path), all in the XPath engine.
+_MATCH_HREF_XPATH = (
+    "//a[starts-with(@href, '/football/') and not(contains(@href, '/results/'))"
+    " and string-length(@href) - string-length(translate(@href, '/', '')) >= 4]/@href"
+)
+
+def _extract_match_hrefs(html: str) -> List[str]:
+    if not html.strip():
+        return []
+    # dict keeps search-result order while deduping in O(1) per link
+    hrefs = lxml.html.fromstring(html).xpath(_MATCH_HREF_XPATH)
+    return list(dict.fromkeys(ODDSPORTAL_BASE + href for href in hrefs))
+
+async def _search_html_http(search_url: str) -> str:
+    # The search result list is plain HTML: one HTTP round-trip instead of a browser navigation.
+    if AsyncSession is None:
+        return ""
+    await _LIMITER.wait(urlsplit(search_url).netloc)
+    try:
+        resp = await _http_session().get(
+            search_url, headers={"Accept-Language": "en-US,en;q=0.9"}, timeout=NAV_TIMEOUT_MS / 1000
+        )
+    except Exception as e:
+        print(f"[warn] http search failed for {search_url} -> {e}")
+        return ""
+    if resp.status_code != 200:
+        return ""
+    return resp.text or ""
+
+# Consent button by accessible name: one role query covers "I Accept", "Accept", "Accept All", "Agree".
+_ACCEPT_RE = re.compile(r"^\s*(i accept|accept( all)?|agree)\s*$", re.I)
+_OVERLAY_CLOSE_SELECTORS = ("button[aria-label='Close']", "text=Close", "text=Reject All")
+
+def _any_of(page: Page, selectors: Tuple[str, ...]) -> Locator:
+    loc = page.locator(selectors[0])
+    for sel in selectors[1:]:
+        loc = loc.or_(page.locator(sel))
+    return loc.first
+
+async def _click_if_visible(loc: Locator, timeout: int) -> None:
+    # One visibility probe for the whole selector union. No auto-wait on purpose: once consent is
+    # given the button never shows up again, and waiting for it would cost every navigation.
+    try:
+        if await loc.is_visible():
+            await loc.click(timeout=timeout)
+    except Exception:
+        pass
+
+async def _accept_cookies_if_present(page: Page) -> None:
+    # Consent button matched by accessible name (_ACCEPT_RE) in one role query. If not present, ignore.
+    await _click_if_visible(page.get_by_role("button", name=_ACCEPT_RE).first, timeout=800)
+
+async def _close_overlays(page: Page) -> None:
     # Sometimes there is a privacy modal covering the page
     # Try ESC and some close buttons
     try:
-        page.keyboard.press("Escape")
+        await page.keyboard.press("Escape")
     except Exception:
         pass
-    for sel in ["button[aria-label='Close']", "text=Close", "text=Reject All"]:
-        try:
-            el = page.locator(sel).first
-            if el and el.is_visible(timeout=600):
-                el.click(timeout=600)
-                page.wait_for_timeout(250)
-                return
-        except Exception:
-            pass
+    await _click_if_visible(_any_of(page, _OVERLAY_CLOSE_SELECTORS), timeout=600)
 
-def _search_and_pick_match_link(page, home: str, away: str, league: str) -> Optional[str]:
+# One round-trip returning only the result anchors, as an HTML fragment _extract_match_hrefs understands.
+_JS_MATCH_ANCHORS_HTML = f"""
+() => "<div>" + Array.from(document.querySelectorAll("{_MATCH_ANCHOR_CSS}"), a => a.outerHTML).join("") + "</div>"
+"""
+
+SEARCH_CACHE_TTL = _env_int("OH_SEARCH_CACHE_TTL", 6 * 3600)  # seconds, 0 disables
+
+def _search_cache_path(query: str) -> Path:
+    return SEARCH_CACHE_DIR / f"{hashlib.sha1(query.encode('utf-8'), usedforsecurity=False).hexdigest()}.html"
+
+def _read_search_cache(cache_path: Path) -> Optional[str]:
+    try:
+        if time.time() - cache_path.stat().st_mtime < SEARCH_CACHE_TTL:
+            return cache_path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return None
+
+def _write_search_cache(cache_path: Path, html: str) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(html, encoding="utf-8")
+    except OSError:
+        pass
+
+async def fetch_search_html(page: Page, query: str) -> str:
+    """
+    Returns the OddsPortal search result HTML for query.
+    Order: fresh on-disk copy (younger than SEARCH_CACHE_TTL) -> HTTP -> browser render.
+    Only results that contain match links are cached, so blocked or empty pages get retried next run.
+    Disk I/O and HTML parsing run in worker threads so they never stall the other pages' workers.
+    """
+    cache_path = _search_cache_path(query)
+    if SEARCH_CACHE_TTL > 0:
+        cached = await asyncio.to_thread(_read_search_cache, cache_path)
+        if cached is not None:
+            return cached
+
+    search_url = f"{ODDSPORTAL_BASE}/search/?q={_RE_WS.sub('+', query)}"
+    html = await _search_html_http(search_url)
+    found = bool(await asyncio.to_thread(_extract_match_hrefs, html))
+    if not found:
+        # Fallback: render the search page in the browser.
+        await _goto(page, search_url, _MATCH_ANCHOR_CSS)
+        await _accept_cookies_if_present(page)
+        await _close_overlays(page)
+        html = await page.evaluate(_JS_MATCH_ANCHORS_HTML)
+        found = bool(await asyncio.to_thread(_extract_match_hrefs, html))
+
+    if SEARCH_CACHE_TTL > 0 and found:
+        await asyncio.to_thread(_write_search_cache, cache_path, html)
+    return html
+
+# Match pages embed {"eventData": {"home": ..., "away": ...}} as JSON in this element's "data" attribute.
+_MATCH_HEADER_SELECTOR = "#react-event-header"
+_MATCH_HEADER_TEXT_SELECTOR = "h1, [class*='participant']"
+
+async def _match_header_text(page: Page) -> str:
+    # A few hundred chars at most, instead of the whole body text.
+    try:
+        data = await page.locator(_MATCH_HEADER_SELECTOR).first.get_attribute("data", timeout=1000)
+        event = json.loads(data or "{}").get("eventData") or {}
+        if event.get("home") and event.get("away"):
+            return f"{event['home']} {event['away']}"
+    except (PWTimeoutError, ValueError, AttributeError):
+        pass
+    return " ".join(await page.locator(_MATCH_HEADER_TEXT_SELECTOR).all_inner_texts())
+
+async def _search_and_pick_match_link(
+    search_page: Page, validate_page: Page, home: str, away: str, league: str
+) -> Optional[str]:
     """
     Strategy:
-    1) Open OddsPortal search page with query: "Home Away"
-    2) Accept cookies if needed
-    3) Find search results that look like a MATCH page
-    4) Validate by opening candidate and checking both team names appear in page text
+    1) Fetch OddsPortal search page with query "Home Away" (disk cache, then HTTP,
+       then the browser, accepting cookies, if HTTP yields nothing)
+    2) Find search results that look like a MATCH page
+    3) Validate by opening candidate and checking both team names appear in its match header
+    Search (browser fallback only) and validation use separate pages, so a rendered result
+    list is never torn down just to open a candidate.
     Returns match URL or None.
     """
+    home_s = _slug(home)
+    away_s = _slug(away)
+    if not home_s or not away_s:
+        # Nothing to validate against: a candidate could never be accepted.
+        return None
+    teams = TeamMatcher(home_s, away_s)
+
     query = f"{home} {away}".strip()
-    search_url = f"{ODDSPORTAL_BASE}/search/?q={re.sub(r'\\s+', '+', query)}"
-    page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
-    page.wait_for_timeout(700)
-    _accept_cookies_if_present(page)
-    _close_overlays(page)
-    page.wait_for_timeout(500)
-
-    # Collect candidate links
-    # OddsPortal search results can vary; we grab all internal links and filter.
-    anchors = page.locator("a[href^='/']").all()
-    hrefs: List[str] = []
-    for a in anchors:
-        try:
-            href = a.get_attribute("href") or ""
-            if not href:
-                continue
-            # avoid obvious non-match sections
-            if href.startswith("/search/"):
-                continue
-            # Often match pages contain "/football/" and end with a slash.
-            if "/football/" in href and href.count("/") >= 4:
-                full = ODDSPORTAL_BASE + href
-                if full not in hrefs:
-                    hrefs.append(full)
-        except Exception:
-            continue
+    html = await fetch_search_html(search_page, query)
+    hrefs = await asyncio.to_thread(_extract_match_hrefs, html)
 
     # If nothing, return None
     if not hrefs:
         return None
 
-    # Validate candidates by checking page text has both teams
-    home_s = _slug(home)
-    away_s = _slug(away)
+    # Match URLs embed both team slugs ("/football/<country>/<league>/home-away-<id>/"): open only
+    # those naming both teams when there are any, else the closest ones first.
+    hrefs = _rank_candidates(hrefs, home_s, away_s)
 
+    # Validate candidates by checking the match header names both teams
     for cand in hrefs[:8]:  # limit attempts
         try:
-            page.goto(cand, wait_until="domcontentloaded", timeout=60000)
-            page.wait_for_timeout(700)
-            _accept_cookies_if_present(page)
-            _close_overlays(page)
-            page.wait_for_timeout(600)
-            txt = page.inner_text("body", timeout=3000)
-            t = _slug(txt)
-            if home_s and away_s and (home_s in t) and (away_s in t):
+            await _goto(validate_page, cand, f"{_MATCH_HEADER_SELECTOR}, h1")
+            await _accept_cookies_if_present(validate_page)
+            await _close_overlays(validate_page)
+            t = _normalize(await _match_header_text(validate_page))
+            if teams.matches(t):
                 return cand
         except Exception:
             continue
 
     return None
 
+# ---- Page pool ----
+
+# Only the match header is read, so nothing that merely paints the page needs downloading.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+# Ads/analytics: scripts and beacons that never affect the match header or result links.
+_BLOCKED_HOST_SUFFIXES = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "criteo.com",
+    "criteo.net",
+    "scorecardresearch.com",
+    "hotjar.com",
+    "facebook.net",
+)
+
+def _is_blocked_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == sfx or host.endswith("." + sfx) for sfx in _BLOCKED_HOST_SUFFIXES)
+
+async def _block_heavy_resources(route: Route) -> None:
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES or _is_blocked_host(route.request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+POOL_SIZE = max(1, _env_int("OH_POOL_SIZE", 8))
+TASK_TIMEOUT = max(1, _env_int("OH_TASK_TIMEOUT", 25))  # seconds per match, search + validation
+
+@dataclass(frozen=True)
+class WorkerPages:
+    search: Page
+    validate: Page
+
+class PagePool:
+    """
+    Fixed set of (search, validate) page pairs from one browser context, lent out to one worker at a time.
+    The queue doubles as the concurrency bound: at most len(slots) searches run at once.
+    Pages are created once and only re-navigated between tasks: never close them, open per-task
+    pages, or clear cookies here - that would throw away the renderer, consent cookie and HTTP cache.
+    """
+
+    def __init__(self, slots: List[WorkerPages]) -> None:
+        self._slots: asyncio.Queue[WorkerPages] = asyncio.Queue()
+        for slot in slots:
+            self._slots.put_nowait(slot)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[WorkerPages]:
+        slot = await self._slots.get()
+        try:
+            yield slot
+        finally:
+            self._slots.put_nowait(slot)
+
+async def _process(pool: PagePool, group: List[MatchTask], shots: ShotQueue, out: OrderedRowWriter) -> None:
+    # Resolve the first task of the group, then copy the outcome to the others (same fixture).
+    tsk, *dups = group
+    home, away = _split_match(tsk.match)
+    async with pool.slot() as pages:
+        validate_url = pages.validate.url
+        # Debug shots show the validation page if a candidate was opened for this task, else the search page.
+        def shot_page() -> Page:
+            return pages.validate if pages.validate.url != validate_url else pages.search
+        try:
+            # Bound the tail: one stuck page must not hold its pool slot for minutes.
+            link = await asyncio.wait_for(
+                _search_and_pick_match_link(pages.search, pages.validate, home, away, tsk.league),
+                timeout=TASK_TIMEOUT,
+            )
+            if link:
+                tsk.oddsportal_link = link
+                tsk.status = "ok"
+                print(f"[ok] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league}) -> {link}")
+            else:
+                tsk.status = "link-miss"
+                print(f"[link-miss] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league})")
+                await _debug_screenshot(shot_page(), f"search-miss-{tsk.bucket}-{tsk.idx}", shots)
+        except (PWTimeoutError, TimeoutError):
+            tsk.status = "link-miss"
+            print(f"[timeout] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league})")
+            await _debug_screenshot(shot_page(), f"timeout-{tsk.bucket}-{tsk.idx}", shots)
+        except Exception as e:
+            tsk.status = "link-miss"
+            print(f"[error] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league}) -> {e}")
+            await _debug_screenshot(shot_page(), f"error-{tsk.bucket}-{tsk.idx}", shots)
+
+    for dup in dups:
+        dup.oddsportal_link = tsk.oddsportal_link
+        dup.status = tsk.status
+        print(f"[{dup.status}] {dup.bucket} #{dup.idx} {dup.match} ({dup.league}) -> same as {tsk.bucket} #{tsk.idx}")
+    out.advance()
+
+async def _resolve_links(groups: List[List[MatchTask]], out: OrderedRowWriter) -> None:
+    async with async_playwright() as p:
+        # Persistent profile: on repeat runs the privacy overlay is already accepted and
+        # static assets come from Chromium's disk cache.
+        context = await p.chromium.launch_persistent_context(
+            str(PROFILE_DIR), headless=True, viewport={"width": 1400, "height": 900}
+        )
+        context.set_default_navigation_timeout(NAV_TIMEOUT_MS)
+        context.set_default_timeout(ACTION_TIMEOUT_MS)
+        await context.route("**/*", _block_heavy_resources)
+        slots = [
+            WorkerPages(search=await context.new_page(), validate=await context.new_page())
+            for _ in range(min(POOL_SIZE, len(groups)))
+        ]
+        pool = PagePool(slots)
+        shots: ShotQueue = asyncio.Queue()
+        writer = asyncio.create_task(_screenshot_writer(shots))
+
+        try:
+            await asyncio.gather(*[_process(pool, g, shots, out) for g in groups])
+        finally:
+            shots.put_nowait(None)
+            await writer
+            await _close_http_session()
+
+        await context.close()
+
+# ---- Link cache ----
+
+LINK_CACHE_TTL = _env_int("OH_CACHE_TTL", 7 * 24 * 3600)  # seconds, 0 disables
+
+def _open_link_cache() -> sqlite3.Connection:
+    LINK_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(LINK_CACHE_FILE)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, link TEXT NOT NULL, ts INTEGER NOT NULL)")
+    return conn
+
+def _cached_links(conn: sqlite3.Connection, keys: List[str]) -> Dict[str, str]:
+    min_ts = int(time.time()) - LINK_CACHE_TTL
+    found: Dict[str, str] = {}
+    for key in keys:
+        row = conn.execute("SELECT link FROM cache WHERE key = ? AND ts > ?", (key, min_ts)).fetchone()
+        if row:
+            found[key] = row[0]
+    return found
+
+def _store_links(conn: sqlite3.Connection, links: Dict[str, str]) -> None:
+    # Only validated links are stored: a miss is always retried on the next run.
+    now = int(time.time())
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO cache (key, link, ts) VALUES (?, ?, ?)",
+            [(key, link, now) for key, link in links.items()],
+        )
+
 # ---- Main ----
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
+    global SEARCH_CACHE_TTL
+
+    parser = argparse.ArgumentParser(description="Find OddsPortal match links for the selected input matches.")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the link/search caches")
+    parser.add_argument("--shard", type=int, default=0, help="index of the fixture shard to process (0-based)")
+    parser.add_argument("--num-shards", type=int, default=1, help="total number of shards")
+    args = parser.parse_args(argv)
+    if args.num_shards < 1 or not 0 <= args.shard < args.num_shards:
+        parser.error("--shard must be in [0, --num-shards)")
+    use_cache = not args.no_cache and LINK_CACHE_TTL > 0
+    if args.no_cache:
+        SEARCH_CACHE_TTL = 0
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+    if DEBUG_DUMP:
+        DEBUG_DIR.mkdir(parents=True, exist_ok=True)
 
     tasks: List[MatchTask] = []
     for idx, match, league in _read_input_csv(INPUT_OVER15):
@@ -212,51 +659,47 @@ def main() -> int:
         print("[warn] No tasks found in input CSVs.")
         return 0
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={"width": 1400, "height": 900})
-        page = context.new_page()
-
-        for tsk in tasks:
-            home, away = _split_match(tsk.match)
-            try:
-                link = _search_and_pick_match_link(page, home, away, tsk.league)
-                if link:
-                    tsk.oddsportal_link = link
-                    tsk.status = "ok"
-                    print(f"[ok] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league}) -> {link}")
-                else:
-                    tsk.status = "link-miss"
-                    print(f"[link-miss] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league})")
-                    # Debug screenshot
-                    try:
-                        page.screenshot(path=str(DEBUG_DIR / f"{_timestamp()}_search-miss-{tsk.bucket}-{tsk.idx}.png"), full_page=True)
-                    except Exception:
-                        pass
-            except PWTimeoutError:
-                tsk.status = "link-miss"
-                print(f"[timeout] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league})")
-                try:
-                    page.screenshot(path=str(DEBUG_DIR / f"{_timestamp()}_timeout-{tsk.bucket}-{tsk.idx}.png"), full_page=True)
-                except Exception:
-                    pass
-            except Exception as e:
-                tsk.status = "link-miss"
-                print(f"[error] {tsk.bucket} #{tsk.idx} {tsk.match} ({tsk.league}) -> {e}")
-                try:
-                    page.screenshot(path=str(DEBUG_DIR / f"{_timestamp()}_error-{tsk.bucket}-{tsk.idx}.png"), full_page=True)
-                except Exception:
-                    pass
-
-        context.close()
-        browser.close()
-
-    # Write output CSV
-    with OUT_MATCH_LINKS.open("w", encoding="utf-8", newline="") as f:
+    # Look each fixture up once even if it appears in both buckets
+    tasks_by_key: Dict[str, List[MatchTask]] = {}
+    for t in tasks:
+        tasks_by_key.setdefault(_match_key(t.match), []).append(t)
+
+    if args.num_shards > 1:
+        # Shard by fixture (stable crc32, not the per-process str hash) so a fixture listed in both
+        # buckets is still resolved once, on one runner.
+        tasks_by_key = {
+            key: group
+            for key, group in tasks_by_key.items()
+            if zlib.crc32(key.encode("utf-8")) % args.num_shards == args.shard
+        }
+        tasks = [t for t in tasks if _match_key(t.match) in tasks_by_key]
+        print(f"[info] shard {args.shard}/{args.num_shards}: {len(tasks_by_key)} fixtures, {len(tasks)} rows")
+
+    # Output is opened up front and streamed as tasks finish (see OrderedRowWriter)
+    with OUT_MATCH_LINKS.open("w", encoding="utf-8", newline="", buffering=1 << 20) as f:
         w = csv.writer(f)
-        w.writerow(["bucket", "idx", "match", "league", "oddsportal_link", "status"])
-        for t in tasks:
-            w.writerow([t.bucket, t.idx, t.match, t.league, t.oddsportal_link, t.status])
+        w.writerow(OUT_HEADER)
+        out = OrderedRowWriter(w, tasks)
+
+        cached: Dict[str, str] = {}
+        if use_cache:
+            with closing(_open_link_cache()) as conn:
+                cached = _cached_links(conn, list(tasks_by_key))
+            for key, link in cached.items():
+                for t in tasks_by_key[key]:
+                    t.oddsportal_link = link
+                    t.status = "ok"
+                    print(f"[ok] {t.bucket} #{t.idx} {t.match} ({t.league}) -> {link} (cached)")
+            out.advance()
+
+        pending = {key: group for key, group in tasks_by_key.items() if key not in cached}
+        if pending:
+            asyncio.run(_resolve_links(list(pending.values()), out))
+
+        if use_cache:
+            resolved = {key: group[0].oddsportal_link for key, group in pending.items() if group[0].status == "ok"}
+            with closing(_open_link_cache()) as conn:
+                _store_links(conn, resolved)
 
     print(f"[ok] wrote: {OUT_MATCH_LINKS}")
     return 0
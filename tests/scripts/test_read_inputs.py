@@ -0,0 +1,55 @@
+import importlib.util
+from pathlib import Path
+import sys
+
+import pytest
+
+# scripts/ is not a package: load the script module straight from its file
+_SCRIPT_PATH = Path(__file__).resolve().parents[2] / "scripts" / "read_inputs.py"
+_spec = importlib.util.spec_from_file_location("read_inputs", _SCRIPT_PATH)
+read_inputs = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = read_inputs
+_spec.loader.exec_module(read_inputs)
+
+extract_matches = read_inputs.extract_matches
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_extract_matches_unquoted(tmp_path, newline):
+    lines = [
+        "idx,match,league",
+        "1,Athletic Bilbao vs Elche,LaLiga",
+        "2, Getafe vs Sevilla ,LaLiga",
+        "3,Filtro: Over 1.5 vs Over 2.5,",
+        "4,no match here,LaLiga",
+        "5,,",
+        "6,Betis vs Girona",
+    ]
+    path = tmp_path / "Over15.csv"
+    path.write_bytes(newline.join(lines).encode("utf-8"))
+
+    assert extract_matches(path) == ["Athletic Bilbao vs Elche", "Getafe vs Sevilla", "Betis vs Girona"]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_extract_matches_quoted(tmp_path, newline):
+    lines = [
+        '"idx","match","league"',
+        '"1","Athletic Bilbao vs Elche","LaLiga"',
+        '2,"Brighton, Hove vs Leeds",Premier League',
+        '"3","filtro vs todo",""',
+        '"4","no match here","LaLiga"',
+        '"5"',
+        "6,Betis vs Girona,LaLiga",
+    ]
+    path = tmp_path / "Over05_1h.csv"
+    path.write_bytes(newline.join(lines).encode("utf-8"))
+
+    assert extract_matches(path) == ["Athletic Bilbao vs Elche", "Brighton, Hove vs Leeds", "Betis vs Girona"]
+
+
+def test_extract_matches_empty_file(tmp_path):
+    path = tmp_path / "Over15.csv"
+    path.write_text("", encoding="utf-8")
+
+    assert extract_matches(path) == []
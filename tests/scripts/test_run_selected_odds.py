@@ -0,0 +1,397 @@
+import asyncio
+from contextlib import closing
+import csv
+import importlib.util
+import io
+from itertools import pairwise
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+import pytest
+
+# scripts/ is not a package: load the script module straight from its file
+_SCRIPT_PATH = Path(__file__).resolve().parents[2] / "scripts" / "run_selected_odds.py"
+_spec = importlib.util.spec_from_file_location("run_selected_odds", _SCRIPT_PATH)
+run_selected_odds = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = run_selected_odds  # dataclasses look their module up here
+_spec.loader.exec_module(run_selected_odds)
+
+TeamMatcher = run_selected_odds.TeamMatcher
+_rank_candidates = run_selected_odds._rank_candidates
+MatchTask = run_selected_odds.MatchTask
+OrderedRowWriter = run_selected_odds.OrderedRowWriter
+DomainRateLimiter = run_selected_odds.DomainRateLimiter
+_extract_match_hrefs = run_selected_odds._extract_match_hrefs
+
+
+@pytest.mark.parametrize(
+    ("home_s", "away_s", "text", "expected"),
+    [
+        ("athletic bilbao", "elche", "athletic bilbao elche", True),
+        ("athletic bilbao", "elche", "elche athletic bilbao", True),
+        ("athletic bilbao", "elche", "athletic bilbao getafe", False),
+        ("athletic bilbao", "elche", "", False),
+        # Substring of a longer word still counts (plain containment, no word boundaries)
+        ("ab", "b", "ab", True),
+        # Identical names only need to appear once
+        ("real madrid", "real madrid", "real madrid sevilla", True),
+    ],
+)
+def test_team_matcher_requires_both_names(home_s, away_s, text, expected):
+    assert TeamMatcher(home_s, away_s).matches(text) is expected
+
+
+@pytest.mark.parametrize(
+    ("home_s", "away_s", "text", "expected"),
+    [
+        # A name nested in the other only counts when it also appears on its own
+        ("inter", "inter miami", "inter miami", False),
+        ("inter miami", "inter", "inter miami", False),
+        ("real madrid", "real madrid b", "real madrid b", False),
+        ("inter", "inter miami", "inter inter miami", True),
+        ("real madrid", "real madrid b", "real madrid real madrid b", True),
+    ],
+)
+def test_team_matcher_nested_names(home_s, away_s, text, expected):
+    assert TeamMatcher(home_s, away_s).matches(text) is expected
+
+
+def test_team_matcher_escapes_regex_metacharacters():
+    matcher = TeamMatcher("a.b", "c+d")
+
+    assert matcher.matches("a.b c+d") is True
+    assert matcher.matches("axb ccd") is False
+
+
+_BASE = "https://www.oddsportal.com/football/spain/laliga"
+
+
+def test_rank_candidates_returns_only_full_token_matches():
+    hrefs = [
+        f"{_BASE}/getafe-elche-AbC123/",
+        f"{_BASE}/athletic-bilbao-elche-XyZ789/",
+        f"{_BASE}/athletic-bilbao-getafe-QwE456/",
+    ]
+
+    assert _rank_candidates(hrefs, "athletic bilbao", "elche") == [f"{_BASE}/athletic-bilbao-elche-XyZ789/"]
+
+
+def test_rank_candidates_orders_full_token_matches_by_score():
+    hrefs = [
+        f"{_BASE}/brighton-hove-leeds-AbC123/",
+        f"{_BASE}/brighton-hove-albion-leeds-DeF456/",
+        f"{_BASE}/brighton-and-hove-albion-leeds-XyZ789/",
+    ]
+
+    assert _rank_candidates(hrefs, "brighton and hove albion", "leeds") == [
+        f"{_BASE}/brighton-and-hove-albion-leeds-XyZ789/",
+        f"{_BASE}/brighton-hove-albion-leeds-DeF456/",
+    ]
+
+
+def test_rank_candidates_requires_a_token_from_each_team():
+    # A long home name alone reaches the capped threshold (4 of 5 tokens) without naming the away team
+    home_only = [f"{_BASE}/brighton-and-hove-albion-team{i}-AbC{i}/" for i in range(9)]
+    hrefs = [*home_only, f"{_BASE}/brighton-and-hove-albion-leeds-XyZ789/"]
+
+    ranked = _rank_candidates(hrefs, "brighton and hove albion", "leeds")
+
+    assert ranked == [f"{_BASE}/brighton-and-hove-albion-leeds-XyZ789/"]
+
+
+def test_rank_candidates_falls_back_to_ranked_list():
+    hrefs = [
+        f"{_BASE}/getafe-sevilla-AbC123/",
+        f"{_BASE}/getafe-elche-DeF456/",
+        f"{_BASE}/athletic-bilbao-getafe-QwE456/",
+        f"{_BASE}/betis-elche-XyZ789/",
+    ]
+
+    # No URL carries every token: all are kept, best score first, ties in search-result order
+    assert _rank_candidates(hrefs, "athletic bilbao", "elche") == [
+        f"{_BASE}/athletic-bilbao-getafe-QwE456/",
+        f"{_BASE}/getafe-elche-DeF456/",
+        f"{_BASE}/betis-elche-XyZ789/",
+        f"{_BASE}/getafe-sevilla-AbC123/",
+    ]
+
+
+def test_rank_candidates_caps_threshold_at_four_tokens():
+    # Slug drops "club" and "de": 4 of the 6 wanted tokens are enough to count as a full match
+    hrefs = [
+        f"{_BASE}/real-madrid-getafe-AbC123/",
+        f"{_BASE}/atletico-madrid-real-sociedad-XyZ789/",
+    ]
+
+    assert _rank_candidates(hrefs, "club atletico de madrid", "real sociedad") == [
+        f"{_BASE}/atletico-madrid-real-sociedad-XyZ789/"
+    ]
+
+
+def test_rank_candidates_uses_last_path_segment_only():
+    # "spain" in the league path must not count towards the score
+    hrefs = [f"{_BASE}/girona-getafe-AbC123/", f"{_BASE}/girona-spain-XyZ789/"]
+
+    assert _rank_candidates(hrefs, "girona", "spain") == [f"{_BASE}/girona-spain-XyZ789/"]
+
+
+def _written_rows(buf: io.StringIO) -> list:
+    return list(csv.reader(io.StringIO(buf.getvalue())))
+
+
+def test_ordered_row_writer_waits_for_earlier_rows():
+    tasks = [MatchTask("over15", i, f"Home{i} vs Away{i}", "LaLiga") for i in range(3)]
+    buf = io.StringIO()
+    writer = OrderedRowWriter(csv.writer(buf), tasks)
+
+    # Later rows resolve first: nothing is written while row 0 is still pending
+    tasks[2].status = "link-miss"
+    tasks[1].oddsportal_link, tasks[1].status = "https://www.oddsportal.com/m1/", "ok"
+    writer.advance()
+    assert _written_rows(buf) == []
+
+    tasks[0].oddsportal_link, tasks[0].status = "https://www.oddsportal.com/m0/", "ok"
+    writer.advance()
+    assert _written_rows(buf) == [
+        ["over15", "0", "Home0 vs Away0", "LaLiga", "https://www.oddsportal.com/m0/", "ok"],
+        ["over15", "1", "Home1 vs Away1", "LaLiga", "https://www.oddsportal.com/m1/", "ok"],
+        ["over15", "2", "Home2 vs Away2", "LaLiga", "", "link-miss"],
+    ]
+
+
+def test_ordered_row_writer_writes_resolved_prefix_once():
+    tasks = [MatchTask("over05_1h", i, f"Home{i} vs Away{i}", "") for i in range(3)]
+    buf = io.StringIO()
+    writer = OrderedRowWriter(csv.writer(buf), tasks)
+
+    tasks[0].status = "link-miss"
+    writer.advance()
+    writer.advance()
+    assert [row[1] for row in _written_rows(buf)] == ["0"]
+
+    # Row 2 stays unwritten behind the pending row 1
+    tasks[2].status = "ok"
+    writer.advance()
+    assert [row[1] for row in _written_rows(buf)] == ["0"]
+
+    tasks[1].status = "ok"
+    writer.advance()
+    assert [row[1] for row in _written_rows(buf)] == ["0", "1", "2"]
+
+
+async def test_domain_rate_limiter_spaces_calls_to_one_host():
+    limiter = DomainRateLimiter(min_delay_ms=200)
+    done = []
+
+    async def call():
+        await limiter.wait("www.oddsportal.com")
+        done.append(time.monotonic())
+
+    start = time.monotonic()
+    await asyncio.gather(*[call() for _ in range(5)])
+
+    # First call goes straight through, the other four queue up 200 ms apart
+    gaps = [b - a for a, b in pairwise(done)]
+    assert all(gap >= 0.19 for gap in gaps)
+    assert 0.79 <= done[-1] - start < 1.2
+
+
+async def test_domain_rate_limiter_does_not_block_other_hosts():
+    limiter = DomainRateLimiter(min_delay_ms=200)
+    await limiter.wait("www.oddsportal.com")
+
+    start = time.monotonic()
+    other = asyncio.create_task(limiter.wait("www.google.com"))
+    same = asyncio.create_task(limiter.wait("www.oddsportal.com"))
+    await other
+    other_elapsed = time.monotonic() - start
+    await same
+    same_elapsed = time.monotonic() - start
+
+    assert other_elapsed < 0.1
+    assert same_elapsed >= 0.19
+
+
+_SEARCH_RESULTS_HTML = """
+<html><body>
+  <a href="/search/?q=Athletic+Bilbao+Elche">Search again</a>
+  <a href="/football/">Football</a>
+  <a href="/football/spain/">Spain</a>
+  <a href="/football/spain/laliga">LaLiga</a>
+  <a href="/football/spain/laliga/athletic-bilbao-elche-XyZ789/">Athletic Bilbao - Elche</a>
+  <a href="/football/spain/laliga/results/">Results</a>
+  <a href="/football/spain/laliga-2024-2025/results/#/page/2/">Archive</a>
+  <a href="/tennis/atp-tour/madrid/alcaraz-sinner-AbC123/">Alcaraz - Sinner</a>
+  <a href="/football/spain/laliga/getafe-elche-DeF456/">Getafe - Elche</a>
+  <a href="/football/spain/laliga/athletic-bilbao-elche-XyZ789/">Athletic Bilbao - Elche (again)</a>
+  <a href="/football/spain/laliga/">LaLiga</a>
+  <a>No href</a>
+</body></html>
+"""
+
+
+def test_extract_match_hrefs_filters_and_dedupes():
+    assert _extract_match_hrefs(_SEARCH_RESULTS_HTML) == [
+        "https://www.oddsportal.com/football/spain/laliga/athletic-bilbao-elche-XyZ789/",
+        "https://www.oddsportal.com/football/spain/laliga/getafe-elche-DeF456/",
+        # Four slashes pass the depth check, as with the old href.count("/") >= 4 filter;
+        # candidate validation rejects it since its header never names both teams
+        "https://www.oddsportal.com/football/spain/laliga/",
+    ]
+
+
+@pytest.mark.parametrize("html", ["", "   \n", "<div></div>"])
+def test_extract_match_hrefs_without_links(html):
+    assert _extract_match_hrefs(html) == []
+
+
+def _write_inputs(tmp_path: Path, monkeypatch, over15: list, over05_1h: list) -> Path:
+    # Point the script's fixed input/output paths into tmp_path
+    for name, rows in (("Over15.csv", over15), ("Over05_1h.csv", over05_1h)):
+        lines = ["idx,match,league", *(f"{i},{match},Liga" for i, match in enumerate(rows, start=1))]
+        (tmp_path / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(run_selected_odds, "INPUT_OVER15", tmp_path / "Over15.csv")
+    monkeypatch.setattr(run_selected_odds, "INPUT_OVER05_1H", tmp_path / "Over05_1h.csv")
+    monkeypatch.setattr(run_selected_odds, "OUT_DIR", tmp_path / "out")
+    monkeypatch.setattr(run_selected_odds, "OUT_MATCH_LINKS", tmp_path / "out" / "match_links.csv")
+    # main() zeroes it on --no-cache; monkeypatch restores it afterwards
+    monkeypatch.setattr(run_selected_odds, "SEARCH_CACHE_TTL", run_selected_odds.SEARCH_CACHE_TTL)
+    return tmp_path / "out" / "match_links.csv"
+
+
+def _stub_resolver(monkeypatch, misses: tuple = ()) -> list:
+    # Resolves every fixture but `misses` without a browser; returns the list of looked-up matches
+    looked_up = []
+
+    async def fake_resolve_links(groups, out):
+        for group in groups:
+            looked_up.append(group[0].match)
+            for task in group:
+                if group[0].match in misses:
+                    task.status = "link-miss"
+                else:
+                    task.oddsportal_link = f"https://www.oddsportal.com/football/{group[0].idx}/"
+                    task.status = "ok"
+            out.advance()
+
+    monkeypatch.setattr(run_selected_odds, "_resolve_links", fake_resolve_links)
+    return looked_up
+
+
+def _read_out(path: Path) -> list:
+    with path.open(encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_main_shards_split_fixtures_without_overlap(tmp_path, monkeypatch):
+    over15 = [f"Home{i} vs Away{i}" for i in range(20)]
+    over05_1h = ["Home3 vs Away3", "Home7  vs  Away7", *(f"Other{i} vs Team{i}" for i in range(10))]
+    out_path = _write_inputs(tmp_path, monkeypatch, over15, over05_1h)
+    _stub_resolver(monkeypatch)
+
+    assert run_selected_odds.main(["--no-cache"]) == 0
+    header, *unsharded = _read_out(out_path)
+
+    num_shards = 3
+    shard_rows = []
+    for shard in range(num_shards):
+        looked_up = _stub_resolver(monkeypatch)
+        assert run_selected_odds.main(["--no-cache", "--shard", str(shard), "--num-shards", str(num_shards)]) == 0
+        shard_header, *rows = _read_out(out_path)
+        assert shard_header == header
+        # A fixture listed in both buckets is looked up once, on the shard that holds both rows
+        assert len(looked_up) == len(set(looked_up))
+        shard_rows.append(rows)
+
+    assert all(shard_rows)
+    # Together the shards give exactly the unsharded rows: no fixture lost or written twice
+    merged = [row for rows in shard_rows for row in rows]
+    assert sorted(merged) == sorted(unsharded)
+    for fixture in ("Home3 vs Away3", "Home7"):
+        holders = [n for n, rows in enumerate(shard_rows) if any(row[2].startswith(fixture) for row in rows)]
+        assert len(holders) == 1
+        assert sum(row[2].startswith(fixture) for row in shard_rows[holders[0]]) == 2
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--shard", "2", "--num-shards", "2"],
+        ["--shard", "-1", "--num-shards", "2"],
+        ["--shard", "0", "--num-shards", "0"],
+    ],
+)
+def test_main_rejects_invalid_shard(tmp_path, monkeypatch, argv):
+    _write_inputs(tmp_path, monkeypatch, ["Home vs Away"], [])
+    looked_up = _stub_resolver(monkeypatch)
+
+    with pytest.raises(SystemExit) as exc:
+        run_selected_odds.main(["--no-cache", *argv])
+
+    assert exc.value.code == 2
+    assert looked_up == []
+
+
+@pytest.fixture
+def link_cache(tmp_path, monkeypatch) -> Path:
+    # Same layout as OH_CACHE_DIR, under tmp_path
+    cache_dir = tmp_path / "oh-cache"
+    monkeypatch.setattr(run_selected_odds, "LINK_CACHE_FILE", cache_dir / "match_links.sqlite")
+    monkeypatch.setattr(run_selected_odds, "SEARCH_CACHE_DIR", cache_dir / "search")
+    return cache_dir / "match_links.sqlite"
+
+
+def _cache_rows(path: Path) -> dict:
+    with closing(sqlite3.connect(path)) as conn:
+        return dict(conn.execute("SELECT key, link FROM cache"))
+
+
+def test_cached_links_skips_entries_older_than_ttl(link_cache, monkeypatch):
+    monkeypatch.setattr(run_selected_odds, "LINK_CACHE_TTL", 3600)
+    now = int(time.time())
+    with closing(run_selected_odds._open_link_cache()) as conn:
+        conn.executemany(
+            "INSERT INTO cache (key, link, ts) VALUES (?, ?, ?)",
+            [
+                ("fresh|a", "https://www.oddsportal.com/f/", now - 60),
+                ("stale|b", "https://www.oddsportal.com/s/", now - 7200),
+            ],
+        )
+        found = run_selected_odds._cached_links(conn, ["fresh|a", "stale|b", "unknown|c"])
+
+    assert link_cache.exists()
+    assert found == {"fresh|a": "https://www.oddsportal.com/f/"}
+
+
+def test_main_caches_only_validated_links(tmp_path, monkeypatch, link_cache):
+    out_path = _write_inputs(tmp_path, monkeypatch, ["Home1 vs Away1", "Home2 vs Away2"], ["Home1 vs Away1"])
+    looked_up = _stub_resolver(monkeypatch, misses=("Home2 vs Away2",))
+
+    assert run_selected_odds.main([]) == 0
+    assert looked_up == ["Home1 vs Away1", "Home2 vs Away2"]
+    # The miss is not stored, so it is retried on the next run
+    assert _cache_rows(link_cache) == {"home1|away1": "https://www.oddsportal.com/football/1/"}
+
+    looked_up = _stub_resolver(monkeypatch)
+    assert run_selected_odds.main([]) == 0
+    assert looked_up == ["Home2 vs Away2"]
+    assert [row[4:] for row in _read_out(out_path)[1:]] == [
+        ["https://www.oddsportal.com/football/1/", "ok"],
+        ["https://www.oddsportal.com/football/2/", "ok"],
+        ["https://www.oddsportal.com/football/1/", "ok"],
+    ]
+
+
+def test_main_no_cache_neither_reads_nor_writes_the_cache(tmp_path, monkeypatch, link_cache):
+    _write_inputs(tmp_path, monkeypatch, ["Home1 vs Away1"], [])
+    with closing(run_selected_odds._open_link_cache()) as conn:
+        run_selected_odds._store_links(conn, {"home1|away1": "https://www.oddsportal.com/cached/"})
+    looked_up = _stub_resolver(monkeypatch)
+
+    assert run_selected_odds.main(["--no-cache"]) == 0
+
+    assert looked_up == ["Home1 vs Away1"]
+    assert _cache_rows(link_cache) == {"home1|away1": "https://www.oddsportal.com/cached/"}
+    assert run_selected_odds.SEARCH_CACHE_TTL == 0